@@ -1,50 +1,107 @@
-
-#requires a file with lon-lat only and ouput gives a file with updated address
-
-import csv
-from geopy.geocoders import Nominatim
-import time
-
-# Initialize the geolocator
-geolocator = Nominatim(user_agent="geopy_example")
-
-def reverse_geocode(latitude, longitude):
-    try:
-        location = geolocator.reverse((latitude, longitude), timeout=10)
-        return location.address if location else "Address not found"
-    except Exception as e:
-        print(f"Error: {e}")
-        return "Error fetching address"
-
-# Input and output file paths
-input_file = "lon-lat.csv"  # Replace with your actual input file name
-output_file = "coordinates_with_address.csv"  # Output file
-
-with open(input_file, "r") as infile, open(output_file, "w", newline="") as outfile:
-    reader = csv.reader(infile, delimiter="\t")  # Assuming tab-separated file
-    writer = csv.writer(outfile, delimiter="\t")
-    
-    # Add the new header row
-    writer.writerow(["longitude", "latitude", "address"])
-    
-    for row in reader:
-        try:
-            # Split the longitude and latitude values
-            lon_lat = row[0].split(",")
-            longitude = float(lon_lat[0])
-            latitude = float(lon_lat[1])
-            
-            # Get the address
-            address = reverse_geocode(latitude, longitude)
-            print(f"Processed: {latitude}, {longitude} -> {address}")
-            writer.writerow([longitude, latitude, address])
-            
-            # Pause to avoid overwhelming the API
-            time.sleep(1)
-        except (ValueError, IndexError) as e:
-            print(f"Skipping invalid row: {row} - Error: {e}")
-
-print("Completed adding addresses to the file.")
-
-
-#after completion add this data into formatted_data using python only
\ No newline at end of file
+
+#requires a file with lon-lat only and ouput gives a file with updated address
+
+import asyncio
+import json
+import shelve
+
+import aiohttp
+import pandas as pd
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
+HEADERS = {"User-Agent": "geopy_example"}
+
+# Nominatim usage policy allows at most 1 request per second
+REQUEST_INTERVAL = 1.0
+
+# Per request timeouts in seconds, for connecting and for each read of the response
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 15
+
+# Addresses already looked up are kept on disk between runs
+CACHE_FILE = "geocode_cache.db"
+
+def cache_key(latitude, longitude):
+    # 4 decimals is ~11 m, enough to collapse GPS jitter onto one address
+    return f"{round(latitude, 4)},{round(longitude, 4)}"
+
+async def reverse_geocode(session, pacer, latitude, longitude):
+    # Hold the pacing token for the whole request and until REQUEST_INTERVAL has
+    # passed since it was sent, so requests never go out closer than that even
+    # when the server is slow to answer
+    async with pacer:
+        loop = asyncio.get_running_loop()
+        sent = loop.time()
+        try:
+            params = {"lat": latitude, "lon": longitude, "format": "jsonv2"}
+            async with session.get(NOMINATIM_URL, params=params, headers=HEADERS) as response:
+                response.raise_for_status()
+                location = await response.json()
+            return location.get("display_name", "Address not found")
+        except Exception as e:
+            print(f"Error: {e}")
+            return "Error fetching address"
+        finally:
+            await asyncio.sleep(max(0.0, sent + REQUEST_INTERVAL - loop.time()))
+
+def read_coordinates(input_file):
+    # Parse the lon,lat pairs in pandas' C tokenizer; malformed rows raise here
+    df = pd.read_csv(input_file, header=None, names=["longitude", "latitude"], dtype="float64", engine="c")
+    return df.to_numpy().tolist()
+
+async def geocode_all(coordinates, cache):
+    pacer = asyncio.Semaphore(1)
+    connector = aiohttp.TCPConnector(limit=1, keepalive_timeout=60)
+    # No total timeout, so time spent waiting for the pacer is never counted
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+
+    # Only unique coordinates missing from the cache hit the API
+    missing = {}
+    for longitude, latitude in coordinates:
+        key = cache_key(latitude, longitude)
+        if key not in cache and key not in missing:
+            missing[key] = (longitude, latitude)
+    print(f"{len(coordinates) - len(missing)} rows served from cache, {len(missing)} to fetch")
+
+    async def worker(key, longitude, latitude):
+        address = await reverse_geocode(session, pacer, latitude, longitude)
+        print(f"Processed: {latitude}, {longitude} -> {address}")
+        # Don't persist failures so they are retried on the next run
+        if address != "Error fetching address":
+            cache[key] = address
+        return address
+
+    # One session for the whole run so the TCP/TLS connection is reused
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        fetched = await asyncio.gather(*(worker(key, lon, lat) for key, (lon, lat) in missing.items()))
+
+    addresses = dict(zip(missing, fetched))
+    keys = (cache_key(lat, lon) for lon, lat in coordinates)
+    return [addresses[key] if key in addresses else cache[key] for key in keys]
+
+# Input and output file paths
+input_file = "lon-lat.csv"  # Replace with your actual input file name
+output_file = "coordinates_with_address.jsonl"  # Output file, one JSON object per line
+
+coordinates = read_coordinates(input_file)
+with shelve.open(CACHE_FILE) as cache:
+    addresses = asyncio.run(geocode_all(coordinates, cache))
+
+# Rows are flushed to the file in batches of this size
+WRITE_BATCH_SIZE = 64
+
+# JSON lines keep addresses with commas and Unicode intact without CSV quoting
+with open(output_file, "w", encoding="utf-8", buffering=1 << 20) as outfile:
+    rows = []
+    for (longitude, latitude), address in zip(coordinates, addresses):
+        row = {"longitude": longitude, "latitude": latitude, "address": address}
+        rows.append(json.dumps(row, ensure_ascii=False) + "\n")
+        if len(rows) == WRITE_BATCH_SIZE:
+            outfile.writelines(rows)
+            rows.clear()
+    outfile.writelines(rows)
+
+print("Completed adding addresses to the file.")
+
+
+#after completion add this data into formatted_data using python only
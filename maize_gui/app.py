@@ -1,17 +1,13 @@
 import streamlit as st # type: ignore
 import pandas as pd # type: ignore
 import os
+from utils import COUNTRY_COLUMNS, HARVEST_DAY
 from utils import load_all_data
 from utils import load_all_predictions
+from utils import get_country_slice
+from utils import get_data_fingerprint
 from styles import apply_custom_styles
 from components.navigation import display_navigation
-from tabs.country_analysis import display_country_analysis
-from tabs.predicted_country_analysis import display_predicted_country_analysis
-from tabs.india_analysis import display_india_analysis
-from tabs.predicted_india_analysis import display_predicted_india_analysis
-from tabs.regression_analysis import display_regression_analysis
-from tabs.predicted_regression_analysis import display_predicted_regression_analysis
-from tabs.visualize_model import visualize_model
 
 # Page Configuration
 st.set_page_config(page_title="Global Maize Yield Trends", layout="wide")
@@ -24,30 +20,34 @@ apply_custom_styles()
 if 'page' not in st.session_state:
     st.session_state['page'] = 'country_analysis'
 
-# Load data
-df_all_countries = load_all_data()
-df_predicted = load_all_predictions()
-india_data = df_all_countries[df_all_countries['Country'] == 'India']
-predicted_india = df_predicted[df_predicted['Country'] == 'India']
-
 # Display sidebar navigation
 display_navigation()
 
 # Display the selected page based on session state
+# Tab modules and data are loaded on first use so each rerun only pays for the open page
 if st.session_state['page'] == 'country_analysis':
-    display_country_analysis(df_all_countries)
+    from tabs.country_analysis import display_country_analysis
+    fingerprint = get_data_fingerprint()
+    display_country_analysis(load_all_data(COUNTRY_COLUMNS, HARVEST_DAY, fingerprint), fingerprint)
 # Display the selected page based on session state
 elif st.session_state['page'] == 'predicted_country_analysis':
-    display_predicted_country_analysis(df_predicted)
+    from tabs.predicted_country_analysis import display_predicted_country_analysis
+    fingerprint = get_data_fingerprint(predicted=True)
+    display_predicted_country_analysis(load_all_predictions(COUNTRY_COLUMNS, HARVEST_DAY, fingerprint), fingerprint)
 elif st.session_state['page'] == 'india_analysis':
-    display_india_analysis(india_data)
+    from tabs.india_analysis import display_india_analysis
+    display_india_analysis(get_country_slice('India'))
 elif st.session_state['page'] == 'predicted_india_analysis':
-    display_predicted_india_analysis(predicted_india)
+    from tabs.predicted_india_analysis import display_predicted_india_analysis
+    display_predicted_india_analysis(get_country_slice('India', predicted=True))
 elif st.session_state['page'] == 'regression_analysis':
-    display_regression_analysis(india_data)
+    from tabs.regression_analysis import display_regression_analysis
+    display_regression_analysis(get_country_slice('India'))
 elif st.session_state['page'] == 'predicted_regression_analysis':
-    display_predicted_regression_analysis(predicted_india)
+    from tabs.predicted_regression_analysis import display_predicted_regression_analysis
+    display_predicted_regression_analysis(get_country_slice('India', predicted=True))
 elif st.session_state['page'] == 'visualize_model':
+    from tabs.visualize_model import visualize_model
     visualize_model()
 
 # Footer
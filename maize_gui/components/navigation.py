@@ -1,29 +1,27 @@
 import streamlit as st
 
+# Page keys in display order, mapped to their sidebar labels
+PAGES = {
+    'country_analysis': "Country-wise Analysis",
+    'predicted_country_analysis': "Predicted Country-wise Analysis",
+    'india_analysis': "India-wise Analysis",
+    'predicted_india_analysis': "Predicted India-wise Analysis",
+    'regression_analysis': "Regression Analysis",
+    'predicted_regression_analysis': "Predicted Regression Analysis",
+    'visualize_model': "Visualize Model",
+}
+
 def display_navigation():
     """
-    Display the main navigation sidebar with buttons for different pages
+    Display the main navigation sidebar with a single page selector
     """
     st.sidebar.header("Navigation")
 
-    # Navigation buttons
-    if st.sidebar.button("Country-wise Analysis"):
-        st.session_state['page'] = 'country_analysis'
-
-    if st.sidebar.button("Predicted Country-wise Analysis"):
-        st.session_state['page'] = 'predicted_country_analysis'
-    
-    if st.sidebar.button("India-wise Analysis"):
-        st.session_state['page'] = 'india_analysis'
-    
-    if st.sidebar.button("Predicted India-wise Analysis"):
-        st.session_state['page'] = 'predicted_india_analysis'
-
-    if st.sidebar.button("Regression Analysis"):
-        st.session_state['page'] = 'regression_analysis'
-
-    if st.sidebar.button("Predicted Regression Analysis"):
-        st.session_state['page'] = 'predicted_regression_analysis'
-    
-    if st.sidebar.button("Visualize Model"):
-        st.session_state['page'] = 'visualize_model'
\ No newline at end of file
+    # One radio widget bound to st.session_state['page']
+    st.sidebar.radio(
+        "Navigation",
+        list(PAGES),
+        format_func=PAGES.get,
+        key='page',
+        label_visibility="collapsed"
+    )
\ No newline at end of file
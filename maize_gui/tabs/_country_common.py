@@ -0,0 +1,328 @@
+import streamlit as st
+import plotly.express as px
+import plotly.graph_objects as go
+from types import SimpleNamespace
+
+# Shared by the actual and predicted country pages. The helpers live at module
+# scope so both pages hit the same st.cache_data caches.
+
+@st.cache_data(show_spinner="Processing data... Please wait", max_entries=4)
+def _preprocess(_df_all_countries, variant, fingerprint):
+    """
+    Precompute the frames shared by the trendline and bar views
+
+    Args:
+        _df_all_countries: DataFrame containing day 239 data for all countries,
+            not hashed since the fingerprint identifies the loaded files
+        variant: 'actual' or 'predicted', used as the cache key
+        fingerprint: Result of get_data_fingerprint, used as the cache key
+    """
+    # Data is already restricted to day 239 at load time (used in both views)
+    df_filtered = _df_all_countries
+
+    # Group by year and country to get average yield (for trendline)
+    df_year_country = df_filtered.groupby(['year', 'Country'], observed=True, sort=False)['yield'].mean().reset_index()
+
+    # Yield sum and count per country and year, so the bar chart can average
+    # any year range without going back to the full frame
+    df_year_country_stats = df_filtered.groupby(['Country', 'year'], observed=True, sort=False)['yield'].agg(['sum', 'count'])
+
+    # Indexed by (Country, year) so selections are sorted index lookups
+    return {
+        'year_country_data': df_year_country.set_index(['Country', 'year']).sort_index(),
+        'year_country_stats': df_year_country_stats.sort_index()
+    }
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _meta(_df_all_countries, variant, fingerprint):
+    """
+    Widget options and bounds, shared without the copy st.cache_data makes on every read
+
+    Args:
+        _df_all_countries: DataFrame containing day 239 data for all countries
+        variant: 'actual' or 'predicted', used as the cache key
+        fingerprint: Result of get_data_fingerprint, used as the cache key
+    """
+    min_year, max_year = _df_all_countries['year'].agg(['min', 'max'])
+    return SimpleNamespace(
+        min_year=int(min_year),
+        max_year=int(max_year),
+        countries=sorted(_df_all_countries['Country'].unique().tolist())
+    )
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_trendline(year_country_data, countries, year_lo, year_hi):
+    """
+    Filter the yearly data and build the trendline figure for a set of selections
+
+    Args:
+        year_country_data: Yearly yield indexed by (Country, year)
+        countries: Tuple of selected countries
+        year_lo: First year of the selected range
+        year_hi: Last year of the selected range
+
+    Returns the filtered data and the figure as a dict
+    """
+    df_grouped = year_country_data.loc[
+        (list(countries), slice(year_lo, year_hi)), :
+    ].reset_index()
+    
+    # Interactive Line Chart
+    fig = px.line(
+        df_grouped,
+        x='year',
+        y='yield',
+        color='Country',
+        title='Yearly Maize Yield Trends',
+        labels={'year': 'Year', 'yield': 'Yield (Tons/Ha)'},
+        template='plotly_white',
+        height=600
+    )
+    
+    # Customize chart layout
+    fig.update_layout(
+        hovermode='x unified',
+        legend_title_text='Country',
+        xaxis_title='Year',
+        yaxis_title='Yield (Tons/Ha)',
+        font=dict(size=12),
+        hoverlabel=dict(bgcolor='#323232', font_size=12, font_color='white')
+    )
+    
+    # Add range slider and selector
+    fig.update_xaxes(
+        rangeslider_visible=True,
+        rangeselector=dict(
+            buttons=list([
+                dict(count=5, label="5y", step="year", stepmode="backward"),
+                dict(count=10, label="10y", step="year", stepmode="backward"),
+                dict(step="all")
+            ])
+        )
+    )
+    
+    return df_grouped, fig.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_bar(year_country_stats, countries, year_lo, year_hi, ascending):
+    """
+    Average the yield per country over a year range and build the bar figure
+
+    Args:
+        year_country_stats: Yield sum and count indexed by (Country, year)
+        countries: Tuple of selected countries
+        year_lo: First year of the selected range
+        year_hi: Last year of the selected range
+        ascending: Whether bars are sorted by ascending yield
+
+    Returns the grouped data and the figure as a dict, or None for the figure if no data matches
+    """
+    # Re-group the filtered data
+    totals = year_country_stats.loc[
+        (list(countries), slice(year_lo, year_hi)), :
+    ].groupby(level='Country', observed=True, sort=False).sum()
+    df_grouped = (totals['sum'] / totals['count']).rename('yield').reset_index()
+
+    if df_grouped.empty:
+        return df_grouped, None
+
+    df_grouped = df_grouped.sort_values(by='yield', ascending=ascending)
+
+    fig_bar = px.bar(
+        df_grouped,
+        x='yield',
+        y='Country',
+        orientation='h',
+        color='Country',
+        title=f'Maize Yield by Country ({year_lo} – {year_hi})',
+        labels={'yield': 'Yield (Tons/Ha)'},
+        template='plotly_white',
+        height=600
+    )
+
+    # Add value labels inside bars
+    fig_bar.update_traces(texttemplate='%{x:.2f}', textposition='inside')
+
+    # Customize layout
+    fig_bar.update_layout(
+        showlegend=False,
+        xaxis_title='Yield (Tons/Ha)',
+        yaxis_title='Country',
+        hoverlabel=dict(bgcolor='#323232', font_size=12, font_color='white')
+    )
+
+    return df_grouped, fig_bar.to_dict()
+
+def display_country_page(df_all_countries, variant, fingerprint):
+    """
+    Display the country-wise analysis page with trendline and bar graph options
+    
+    Args:
+        df_all_countries: DataFrame containing day 239 data for all countries
+        variant: 'actual' for recorded yields or 'predicted' for model predictions
+        fingerprint: Result of get_data_fingerprint for the loaded files
+    """
+    st.subheader("Country-wise Analysis")
+    
+    # Preprocessing is cached across reruns and sessions
+    data = _preprocess(df_all_countries, variant, fingerprint)
+    meta = _meta(df_all_countries, variant, fingerprint)
+    
+    # Sub-navigation for Country Analysis
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Trendline Analysis"):
+            st.session_state['country_view'] = 'trendline'
+    with col2:
+        if st.button("Bar Graph Analysis"):
+            st.session_state['country_view'] = 'bar'
+    
+    # Default view
+    if 'country_view' not in st.session_state:
+        st.session_state['country_view'] = 'trendline'
+    
+    # Show the selected view
+    if st.session_state['country_view'] == 'trendline':
+        display_trendline_analysis(data, meta)
+    elif st.session_state['country_view'] == 'bar':
+        display_bar_analysis(data, meta)
+
+def display_trendline_analysis(data, meta):
+    """
+    Display trendline analysis view with interactive charts using preprocessed data
+
+    Args:
+        data: Preprocessed data returned by _preprocess
+        meta: Widget options and bounds returned by _meta
+    """
+    st.subheader("📈 Trendline Analysis")
+    
+    # Control panel
+    st.markdown("<div class='filter-container'>", unsafe_allow_html=True)
+    selected_countries = st.multiselect(
+        "Select Countries to Compare",
+        meta.countries,
+        default=meta.countries
+    )
+    
+    year_range = st.slider(
+        "Select Year Range",
+        min_value=meta.min_year,
+        max_value=meta.max_year,
+        value=(meta.min_year, meta.max_year)
+    )
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+    
+    # Filter the already processed data and build the chart, cached per selection
+    df_grouped, fig = _build_trendline(
+        data['year_country_data'],
+        tuple(sorted(selected_countries)),
+        year_range[0],
+        year_range[1]
+    )
+    
+    # Display interactive chart
+    st.plotly_chart(go.Figure(fig), use_container_width=True)
+    
+    # Insights Section
+    if not df_grouped.empty:
+        st.subheader("🔍 Key Insights")
+        col1, col2, col3 = st.columns(3)
+        
+        # All summary statistics in one aggregation call
+        stats = df_grouped['yield'].agg(['max', 'min', 'mean', 'idxmax', 'idxmin'])
+        
+        with col1:
+            st.metric(
+                label="Highest Overall Yield",
+                value=f"{stats['max']:.2f} Tons/Ha",
+                delta=f"Country: {df_grouped.at[int(stats['idxmax']), 'Country']}"
+            )
+        
+        with col2:
+            st.metric(
+                label="Lowest Overall Yield",
+                value=f"{stats['min']:.2f} Tons/Ha",
+                delta=f"Country: {df_grouped.at[int(stats['idxmin']), 'Country']}"
+            )
+        
+        with col3:
+            st.metric(
+                label="Average Yield",
+                value=f"{stats['mean']:.2f} Tons/Ha"
+            )
+
+def display_bar_analysis(data, meta):
+    """
+    Display bar graph analysis view using preprocessed data
+
+    Args:
+        data: Preprocessed data returned by _preprocess
+        meta: Widget options and bounds returned by _meta
+    """
+    st.subheader("📊 Bar Graph Analysis")
+
+    # Control panel for the bar chart
+    st.markdown("<div class='filter-container'>", unsafe_allow_html=True)
+    selected_countries_bar = st.multiselect(
+        "Select Countries",
+        meta.countries,
+        default=meta.countries
+    )
+
+    year_range = st.slider(
+        "Select Year Range",
+        min_value=meta.min_year,
+        max_value=meta.max_year,
+        value=(meta.min_year, meta.max_year)
+    )
+    
+    sort_order = st.radio(
+        "Sort Order",
+        ["Ascending", "Descending"],
+        horizontal=True,
+        index=1
+    )
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Apply filters to the preprocessed data and build the chart, cached per selection
+    df_grouped, fig_bar = _build_bar(
+        data['year_country_stats'],
+        tuple(sorted(selected_countries_bar)),
+        year_range[0],
+        year_range[1],
+        sort_order == "Ascending"
+    )
+
+    # Create bar chart with Plotly
+    if fig_bar is not None:
+        st.plotly_chart(go.Figure(fig_bar), use_container_width=True)
+
+        # Statistics
+        if len(selected_countries_bar) > 1:
+            st.subheader("📈 Statistics")
+            col1, col2 = st.columns(2)
+            stats = df_grouped['yield'].agg(['max', 'mean', 'idxmax'])
+
+            with col1:
+                highest_country = df_grouped.at[int(stats['idxmax']), 'Country']
+                highest_yield = stats['max']
+                st.info(f"**Highest Yield**: {highest_country} ({highest_yield:.2f} Tons/Ha)")
+
+            with col2:
+                avg_yield = stats['mean']
+                st.info(f"**Average Yield**: {avg_yield:.2f} Tons/Ha")
+    else:
+        st.warning("No data available for the selected filters.")
+
+# Add a reset button function to clear cached data if needed
+def add_reset_button():
+    if st.sidebar.button("Reset Cache"):
+        _preprocess.clear()
+        _meta.clear()
+        _build_trendline.clear()
+        _build_bar.clear()
+        for key in list(st.session_state.keys()):
+            del st.session_state[key]
+        st.experimental_rerun()
\ No newline at end of file
@@ -1,8 +1,165 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import plotly.express as px
+import plotly.graph_objects as go
+
+# Two entries, the current data files and the previous ones
+@st.cache_data(show_spinner="Processing India data... Please wait", max_entries=2)
+def _preprocess_india(india_data):
+    """
+    Precompute the frames shared by the state trend and bar views
+    """
+    # Filter day 239 data once (used in both views); nothing mutates it, so no copy
+    day_mask = india_data['Day'].to_numpy() == 239
+    india_filtered = india_data.loc[day_mask]
+    
+    # Get unique states if available
+    has_state_data = 'State' in india_data.columns
+    if has_state_data:
+        # Categorical states group and filter on integer codes; the categories
+        # come out sorted and hold only the states present in the filtered rows
+        india_filtered = india_filtered.assign(State=india_filtered['State'].astype('category'))
+        available_states = list(india_filtered['State'].cat.categories)
+    else:
+        available_states = []
+    
+    # Prepare state-wise and national data if available
+    if has_state_data:
+        # Single pass over the rows: sums and counts per state-year, so the
+        # state and national means below are exact reductions of this small frame
+        sy = india_filtered.groupby(['State', 'year'], observed=True, dropna=False)['yield'].agg(['sum', 'count'])
+        
+        # Pre-compute state-year grouping (kept sorted by year for the line chart)
+        state_year_data = (sy['sum'] / sy['count']).rename('yield').reset_index().dropna(subset=['State'])
+        
+        # Pre-compute state grouping
+        state_totals = sy.groupby(level='State', observed=True, sort=False).sum()
+        state_data = (state_totals['sum'] / state_totals['count']).rename('yield').reset_index()
+        
+        # Prepare national trend data
+        year_totals = sy.groupby(level='year').sum()
+        india_yearly = (year_totals['sum'] / year_totals['count']).rename('yield').reset_index()
+        
+        # Rows without a State only count towards the national trend; a NaN left in
+        # the State level also cannot be hashed as an argument of _build_india_bar
+        sy = sy[sy.index.get_level_values('State').notna()]
+        sy.index = sy.index.remove_unused_levels()
+    else:
+        india_yearly = india_filtered.groupby('year')['yield'].mean().reset_index()
+        sy = pd.DataFrame()
+        state_year_data = pd.DataFrame()
+        state_data = pd.DataFrame()
+    
+    return {
+        'has_state_data': has_state_data,
+        'available_states': available_states,
+        'national_yearly': india_yearly,
+        'state_year_data': state_year_data,
+        'state_year_stats': sy,
+        'state_data': state_data,
+        'min_year': int(india_filtered['year'].min()),
+        'max_year': int(india_filtered['year'].max())
+    }
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _state_code_map(states):
+    """
+    Category code of each state, shared without the copy st.cache_data makes on every read
+
+    Args:
+        states: Tuple of the State categories
+    """
+    return {state: code for code, state in enumerate(states)}
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_state_trend(state_year_data, states):
+    """
+    Filter the state-year data and build the trend figure for a set of selected states
+
+    Args:
+        state_year_data: Yearly yield per state with a categorical State column
+        states: Tuple of selected states
+
+    Returns the filtered data and the figure as a dict
+    """
+    # Plotly Express is only needed when a figure is (re)built
+    import plotly.express as px
+
+    # Filter preprocessed data for selected states by comparing category codes
+    state_cat = state_year_data['State'].cat
+    code_map = _state_code_map(tuple(state_cat.categories))
+    selected_codes = np.fromiter((code_map[state] for state in states), dtype=state_cat.codes.dtype, count=len(states))
+    state_trends = state_year_data.iloc[np.isin(state_cat.codes.to_numpy(), selected_codes)]
+    
+    # Create the plot using Plotly for better interactivity
+    fig = px.line(
+        state_trends,
+        x='year',
+        y='yield',
+        color='State',
+        title='State-wise Maize Yield Trends in India',
+        labels={'year': 'Year', 'yield': 'Yield (Tons/Ha)'},
+        markers=True
+    )
+    
+    # Enhance plot aesthetics
+    fig.update_layout(
+        xaxis_title='Year',
+        yaxis_title='Yield (Tons/Ha)',
+        legend_title='State',
+        template='plotly_white'
+    )
+    
+    return state_trends, fig.to_dict()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_india_bar(state_year_stats, year_lo, year_hi):
+    """
+    Average the yield per state over a year range and build the bar figure
+
+    Args:
+        state_year_stats: Yield sum and count indexed by (State, year)
+        year_lo: First year of the selected range
+        year_hi: Last year of the selected range
+
+    Returns the figure as a dict, or None if no data matches
+    """
+    import plotly.express as px
+
+    # Filter the per state-year totals for year range, not the day 239 rows
+    years = state_year_stats.index.get_level_values('year')
+    yearly_stats = state_year_stats[(years >= year_lo) & (years <= year_hi)]
+    
+    # Group by state
+    totals = yearly_stats.groupby(level='State', observed=True, sort=False).sum()
+    
+    if totals.empty:
+        return None
+    
+    state_yield = (totals['sum'] / totals['count']).rename('yield').reset_index()
+    state_yield = state_yield.sort_values('yield', ascending=False)
+
+    # Create bar plot with Plotly
+    fig = px.bar(
+        state_yield,
+        x='State',
+        y='yield',
+        title=f'State-wise Yield Distribution in India ({year_lo} – {year_hi})',
+        labels={'State': 'State', 'yield': 'Yield (Tons/Ha)'},
+        color='yield',
+        text_auto='.2f'
+    )
+
+    fig.update_layout(
+        xaxis_tickangle=45,
+        template='plotly_white'
+    )
+
+    return fig.to_dict()
+
 
 def display_india_analysis(india_data):
     """
@@ -10,41 +167,8 @@ def display_india_analysis(india_data):
     """
     st.subheader("India-wise Analysis")
 
-    # Preprocess data once when page loads
-    if 'india_preprocessed_data' not in st.session_state:
-        with st.spinner("Processing India data... Please wait"):
-            # Filter day 239 data once (used in both views)
-            india_filtered = india_data[india_data['Day'] == 239].copy()
-            
-            # Get unique states if available
-            has_state_data = 'State' in india_data.columns
-            available_states = sorted(india_filtered['State'].unique()) if has_state_data else []
-            
-            # Prepare national trend data
-            india_yearly = india_filtered.groupby('year')['yield'].mean().reset_index()
-            
-            # Prepare state-wise data if available
-            if has_state_data:
-                # Pre-compute state-year grouping
-                state_year_data = india_filtered.groupby(['State', 'year'])['yield'].mean().reset_index()
-                
-                # Pre-compute state grouping
-                state_data = india_filtered.groupby('State')['yield'].mean().reset_index()
-            else:
-                state_year_data = pd.DataFrame()
-                state_data = pd.DataFrame()
-            
-            # Store in session state
-            st.session_state['india_preprocessed_data'] = {
-                'filtered_data': india_filtered,
-                'has_state_data': has_state_data,
-                'available_states': available_states,
-                'national_yearly': india_yearly,
-                'state_year_data': state_year_data,
-                'state_data': state_data,
-                'min_year': int(india_filtered['year'].min()),
-                'max_year': int(india_filtered['year'].max())
-            }
+    # Preprocessing is cached across reruns and sessions
+    data = _preprocess_india(india_data)
 
     # Sub-navigation
     col1, col2 = st.columns(2)
@@ -61,35 +185,34 @@ def display_india_analysis(india_data):
 
     # View rendering
     if st.session_state['india_view'] == 'state_trend':
-        display_state_trend_analysis()
+        display_state_trend_analysis(data)
     elif st.session_state['india_view'] == 'bar':
-        display_india_bar_analysis()
+        display_india_bar_analysis(data)
 
 
-def display_state_trend_analysis():
+def display_state_trend_analysis(data):
     """
     Display state-wise trend analysis for India using preprocessed data
     """
     st.subheader("📈 State-wise Maize Yield Trends")
     
-    data = st.session_state['india_preprocessed_data']
-    
     # Check if state data exists
     if not data['has_state_data']:
         st.warning("State information not found in dataset. Showing national trends.")
         
         # Plot national trend using preprocessed data
-        plt.figure(figsize=(20, 8))
-        plt.plot(data['national_yearly']['year'], data['national_yearly']['yield'], 
-                'r-', linewidth=3, marker='o', markersize=8, label='National Average')
-        
-        plt.title('National Maize Yield Trend in India', fontsize=16)
-        plt.xlabel('Year', fontsize=14)
-        plt.ylabel('Yield (Tons/Ha)', fontsize=14)
-        plt.grid(True, linestyle='--', alpha=0.5)
-        plt.legend()
-        plt.tight_layout()
-        st.pyplot(plt)
+        import plotly.express as px
+        fig = px.line(
+            data['national_yearly'],
+            x='year',
+            y='yield',
+            title='National Maize Yield Trend in India',
+            labels={'year': 'Year', 'yield': 'Yield (Tons/Ha)'},
+            markers=True,
+            template='plotly_white'
+        )
+        fig.update_traces(line=dict(color='red', width=3), marker=dict(size=8))
+        st.plotly_chart(fig, use_container_width=True)
     else:
         # State selection
         selected_states = st.multiselect(
@@ -101,29 +224,13 @@ def display_state_trend_analysis():
         if not selected_states:
             st.warning("Please select at least one state")
         else:
-            # Filter preprocessed data for selected states
-            state_trends = data['state_year_data'][data['state_year_data']['State'].isin(selected_states)]
-            
-            # Create the plot using Plotly for better interactivity
-            fig = px.line(
-                state_trends,
-                x='year',
-                y='yield',
-                color='State',
-                title='State-wise Maize Yield Trends in India',
-                labels={'year': 'Year', 'yield': 'Yield (Tons/Ha)'},
-                markers=True
+            # Filter the preprocessed data and build the chart, cached per selection
+            state_trends, fig = _build_state_trend(
+                data['state_year_data'],
+                tuple(sorted(selected_states))
             )
             
-            # Enhance plot aesthetics
-            fig.update_layout(
-                xaxis_title='Year',
-                yaxis_title='Yield (Tons/Ha)',
-                legend_title='State',
-                template='plotly_white'
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(go.Figure(fig), use_container_width=True)
             
             # Display statistics
             st.subheader("📊 State-wise Statistics")
@@ -160,13 +267,11 @@ def display_state_trend_analysis():
                     )
 
 
-def display_india_bar_analysis():
+def display_india_bar_analysis(data):
     """
     Display bar graph analysis for India (state-wise) using preprocessed data
     """
     st.subheader("📊 State-wise Yield Bar Graph Analysis")
-    
-    data = st.session_state['india_preprocessed_data']
 
     # Control panel
     year_range = st.slider(
@@ -178,33 +283,11 @@ def display_india_bar_analysis():
 
     # Filter data for selected year range
     if data['has_state_data']:
-        # Filter preprocessed data for year range
-        yearly_data = data['filtered_data'][
-            data['filtered_data']['year'].between(year_range[0], year_range[1])
-        ]
+        # Group the preprocessed data and build the chart, cached per year range
+        fig = _build_india_bar(data['state_year_stats'], year_range[0], year_range[1])
         
-        if not yearly_data.empty:
-            # Group by state
-            state_yield = yearly_data.groupby('State')['yield'].mean().reset_index()
-            state_yield = state_yield.sort_values('yield', ascending=False)
-
-            # Create bar plot with Plotly
-            fig = px.bar(
-                state_yield,
-                x='State',
-                y='yield',
-                title=f'State-wise Yield Distribution in India ({year_range[0]} – {year_range[1]})',
-                labels={'State': 'State', 'yield': 'Yield (Tons/Ha)'},
-                color='yield',
-                text_auto='.2f'
-            )
-
-            fig.update_layout(
-                xaxis_tickangle=45,
-                template='plotly_white'
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
+        if fig is not None:
+            st.plotly_chart(go.Figure(fig), use_container_width=True)
         else:
             st.warning(f"No data available for year range ({year_range[0]} – {year_range[1]})")
     else:
@@ -213,8 +296,10 @@ def display_india_bar_analysis():
 # Add a reset button function to clear cached data if needed
 def add_reset_india_cache():
     if st.sidebar.button("Reset India Data Cache"):
-        if 'india_preprocessed_data' in st.session_state:
-            del st.session_state['india_preprocessed_data']
+        _preprocess_india.clear()
+        _state_code_map.clear()
+        _build_state_trend.clear()
+        _build_india_bar.clear()
         if 'india_view' in st.session_state:
             del st.session_state['india_view']
         st.experimental_rerun()
\ No newline at end of file
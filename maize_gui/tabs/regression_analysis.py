@@ -1,66 +1,57 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 
 def display_regression_analysis(india_data):
     st.subheader("📊 Interactive Climate and Yield Analysis")
     
-    # Check if data is already preprocessed and stored in session state
-    if 'regression_preprocessed_data' not in st.session_state:
-        with st.spinner("Processing data for analysis... Please wait"):
-            try:
-                # Determine column names for latitude and longitude
-                lon_col = 'longitude' if 'longitude' in india_data.columns else 'lon'
-                lat_col = 'latitude' if 'latitude' in india_data.columns else 'lat'
-
-                required_columns = ['year', lon_col, lat_col, 'tas', 'pr', 'tasmax', 'tasmin',
-                                    'texture_class', 'rds', 'nitrogen', 'co2', 'Day', 'yield']
-                missing_columns = [col for col in required_columns if col not in india_data.columns]
-
-                if missing_columns:
-                    st.error(f"Missing columns in data: {', '.join(missing_columns)}")
-                    st.info("Please make sure the data contains all required columns for analysis.")
-                    return
-
-                # Process data once
-                processed_data = prepare_data_for_analysis(india_data, lon_col, lat_col)
-                
-                if processed_data is None or processed_data.empty:
-                    st.error("No data available for analysis after processing.")
-                    return
-                
-                # Create variable lists and labels once
-                variables = ['pr', 'tas', 'tasmin', 'tasmax', 'rds', 'co2', 'nitrogen']
-                variables = [var for var in variables if var in processed_data.columns]
-                
-                labels = {
-                    'pr': 'Precipitation (kg/m²/s)',
-                    'tas': 'Mean Temperature (°C)',
-                    'tasmin': 'Minimum Temperature (°C)',
-                    'tasmax': 'Maximum Temperature (°C)',
-                    'rds': 'Shortwave Radiation (W/m²)',
-                    'co2': 'CO2 (ppm)',
-                    'nitrogen': 'Nitrogen (tons/ha)'
-                }
-                
-                # Store preprocessed data and metadata in session state
-                st.session_state['regression_preprocessed_data'] = {
-                    'processed_data': processed_data,
-                    'variables': variables,
-                    'labels': labels,
-                    'min_year': int(processed_data['year'].min()),
-                    'max_year': int(processed_data['year'].max())
-                }
-                
-            except Exception as e:
-                st.error(f"Error in data preprocessing: {str(e)}")
-                return
-    
-    # Retrieve preprocessed data from session state
-    data = st.session_state['regression_preprocessed_data']
+    try:
+        # Determine column names for latitude and longitude
+        lon_col = 'longitude' if 'longitude' in india_data.columns else 'lon'
+        lat_col = 'latitude' if 'latitude' in india_data.columns else 'lat'
+
+        required_columns = ['year', lon_col, lat_col, 'tas', 'pr', 'tasmax', 'tasmin',
+                            'texture_class', 'rds', 'nitrogen', 'co2', 'Day', 'yield']
+        missing_columns = [col for col in required_columns if col not in india_data.columns]
+
+        if missing_columns:
+            st.error(f"Missing columns in data: {', '.join(missing_columns)}")
+            st.info("Please make sure the data contains all required columns for analysis.")
+            return
+
+        # Process data once, cached across reruns and sessions
+        processed_data = prepare_data_for_analysis(india_data, lon_col, lat_col)
+        
+        if processed_data is None or processed_data.empty:
+            st.error("No data available for analysis after processing.")
+            return
+        
+        # Create variable lists and labels
+        variables = ['pr', 'tas', 'tasmin', 'tasmax', 'rds', 'co2', 'nitrogen']
+        variables = [var for var in variables if var in processed_data.columns]
+        
+        labels = {
+            'pr': 'Precipitation (kg/m²/s)',
+            'tas': 'Mean Temperature (°C)',
+            'tasmin': 'Minimum Temperature (°C)',
+            'tasmax': 'Maximum Temperature (°C)',
+            'rds': 'Shortwave Radiation (W/m²)',
+            'co2': 'CO2 (ppm)',
+            'nitrogen': 'Nitrogen (tons/ha)'
+        }
+        
+        data = {
+            'processed_data': processed_data,
+            'variables': variables,
+            'labels': labels,
+            'min_year': int(processed_data['year'].min()),
+            'max_year': int(processed_data['year'].max())
+        }
+        
+    except Exception as e:
+        st.error(f"Error in data preprocessing: {str(e)}")
+        return
     
     # View selector buttons
     col1, col2 = st.columns(2)
@@ -84,10 +75,14 @@ def display_regression_analysis(india_data):
             value=(data['min_year'], data['max_year'])
         )
         
-        # Filter preprocessed data based on year range
-        filtered_data = data['processed_data'][
-            data['processed_data']['year'].between(year_range[0], year_range[1])
-        ]
+        # Filter preprocessed data based on year range; the full range (the
+        # initial slider state) uses the cached frame as is
+        if year_range == (data['min_year'], data['max_year']):
+            filtered_data = data['processed_data']
+        else:
+            filtered_data = data['processed_data'][
+                data['processed_data']['year'].between(year_range[0], year_range[1])
+            ]
     except Exception as e:
         st.error(f"Error setting year range: {str(e)}")
         st.info("Using full dataset instead.")
@@ -100,64 +95,61 @@ def display_regression_analysis(india_data):
         display_time_series_analysis(filtered_data, data['variables'], data['labels'])
 
 
+# Two entries, the current data files and the previous ones
+@st.cache_data(show_spinner="Processing data for analysis... Please wait", max_entries=2)
 def prepare_data_for_analysis(country, lon_col, lat_col):
     """Process data once for analysis"""
     try:
-        # Average features across days for each year/location
-        average_features = country.groupby(['year', lon_col, lat_col])[
-            ['tas', 'pr', 'tasmax', 'tasmin', 'texture_class', 'rds', 'nitrogen', 'co2']
-        ].mean().reset_index()
+        keys = ['year', lon_col, lat_col]
 
-        # Get target yield data (from day 239)
-        target_yield = country[country['Day'] == 239][['year', lon_col, lat_col, 'yield']]
+        # Average features across days for each year/location, indexed by the keys
+        # (unsorted, the join and the yearly regroup below don't need the order)
+        average_features = country.groupby(keys, sort=False)[
+            ['tas', 'pr', 'tasmax', 'tasmin', 'texture_class', 'rds', 'nitrogen', 'co2']
+        ].mean()
 
-        # Merge features with target
-        merged_data = pd.merge(
-            average_features,
-            target_yield,
-            on=['year', lon_col, lat_col],
-            how='inner'
-        )
+        # Get target yield data (from day 239) on the same index
+        day_mask = country['Day'].to_numpy() == 239
+        target_yield = country.loc[day_mask, keys + ['yield']].set_index(keys)
 
-        # Select only numeric columns
-        numeric_df = merged_data.select_dtypes(include=[np.number])
+        # Join features with target on the shared index
+        merged_data = average_features.join(target_yield, how='inner').reset_index()
 
-        # Ensure year column is included
-        if 'year' not in numeric_df.columns and 'year' in merged_data.columns:
-            numeric_df['year'] = merged_data['year']
+        # Select the numeric columns, all known from required_columns
+        numeric_df = merged_data.loc[:, ['year', lon_col, lat_col, 'tas', 'pr', 'tasmax', 'tasmin',
+                                         'texture_class', 'rds', 'nitrogen', 'co2', 'yield']]
 
-        # Group by year to get yearly averages
+        # Group by year to get yearly averages (sorted, the time series plots them in order)
         grouped_data = numeric_df.groupby('year', as_index=False).mean()
 
+        # The yearly averages are only plotted and correlated, so float32 is plenty
+        float_cols = ['tas', 'pr', 'tasmax', 'tasmin', 'rds', 'nitrogen', 'co2', 'yield']
+        grouped_data[float_cols] = grouped_data[float_cols].astype(np.float32)
+        grouped_data['year'] = grouped_data['year'].astype(np.int16, copy=False)
+
         return grouped_data
 
     except Exception as e:
         return None
 
 
-def display_scatter_analysis(filtered_data, variables, labels):
-    """Display scatter plot analysis with preprocessed data"""
-    st.subheader("Relationship between Climate Factors and Yield")
-    
-    if not variables:
-        st.error("No analysis variables found in the data.")
-        return
-    
-    titles = labels  # Use labels as titles
-    
-    # Variable selection
-    default_vars = variables[:min(3, len(variables))]
-    selected_vars = st.multiselect(
-        "Select variables to display",
-        options=variables,
-        default=default_vars,
-        format_func=lambda x: titles.get(x, x)
-    )
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_scatter(filtered_data, selected_vars, labels):
+    """
+    Build the climate factor vs. yield subplots for a set of selected variables
 
-    if not selected_vars:
-        st.info("Please select at least one variable to display")
-        return
+    Args:
+        filtered_data: Yearly averages for the selected year range
+        selected_vars: Tuple of selected variables
+        labels: Display label for each variable
+
+    Returns the figure as a dict
+    """
+    # Plotting helpers are only needed when a figure is (re)built
+    from plotly.subplots import make_subplots
 
+    titles = labels  # Use labels as titles
+    
     # Calculate subplot layout
     n_vars = len(selected_vars)
     n_cols = min(3, n_vars)
@@ -170,12 +162,30 @@ def display_scatter_analysis(filtered_data, variables, labels):
         subplot_titles=[titles.get(var, var) for var in selected_vars]
     )
 
+    # Least-squares trendlines for all variables at once, each column using
+    # only the rows where both it and the yield are present
+    X = filtered_data[list(selected_vars)].to_numpy(dtype=np.float64)
+    Y = filtered_data['yield'].to_numpy(dtype=np.float64)[:, None]
+    valid = ~np.isnan(X) & ~np.isnan(Y)
+    n_valid = valid.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = np.where(valid, X, 0).sum(axis=0) / n_valid
+        y_mean = np.where(valid, Y, 0).sum(axis=0) / n_valid
+        x_dev = np.where(valid, X - x_mean, 0)
+        y_dev = np.where(valid, Y - y_mean, 0)
+        x_var = (x_dev * x_dev).sum(axis=0)
+        slopes = (x_dev * y_dev).sum(axis=0) / x_var
+    intercepts = y_mean - slopes * x_mean
+
+    # Plain arrays for the traces, so Plotly does not iterate Series values
+    y = filtered_data['yield'].to_numpy()
+    years = filtered_data['year'].to_numpy()
+
     # Add traces for each variable
     for i, var in enumerate(selected_vars):
         row = i // n_cols + 1
         col = i % n_cols + 1
-        x = filtered_data[var]
-        y = filtered_data['yield']
+        x = filtered_data[var].to_numpy()
 
         # Add scatter plot
         scatter = go.Scatter(
@@ -185,7 +195,7 @@ def display_scatter_analysis(filtered_data, variables, labels):
             name=titles.get(var, var),
             marker=dict(
                 size=8,
-                color=filtered_data['year'],
+                color=years,
                 colorscale='Viridis',
                 colorbar=dict(title="Year") if i == 0 else None,
                 showscale=i == 0
@@ -194,30 +204,23 @@ def display_scatter_analysis(filtered_data, variables, labels):
             f'Year: %{{customdata}}<br>' +
             f'{labels.get(var, var)}: %{{x}}<br>' +
             'Yield: %{y} tons/ha<extra></extra>',
-            customdata=filtered_data['year']
+            customdata=years
         )
         fig.add_trace(scatter, row=row, col=col)
 
         # Add trendline if enough valid data points
-        if x.notna().sum() > 1 and y.notna().sum() > 1:
-            try:
-                valid_mask = x.notna() & y.notna()
-                if valid_mask.sum() >= 2:
-                    z = np.polyfit(x[valid_mask], y[valid_mask], 1)
-                    p = np.poly1d(z)
-                    x_range = np.linspace(x.min(), x.max(), 100)
-
-                    trend = go.Scatter(
-                        x=x_range,
-                        y=p(x_range),
-                        mode='lines',
-                        name=f'Trend ({titles.get(var, var)})',
-                        line=dict(color='rgba(255, 0, 0, 0.8)'),
-                        showlegend=False
-                    )
-                    fig.add_trace(trend, row=row, col=col)
-            except Exception as e:
-                pass  # Skip trendline if calculation fails
+        if n_valid[i] >= 2 and x_var[i] > 0:
+            x_range = np.linspace(np.nanmin(x), np.nanmax(x), 100)
+
+            trend = go.Scatter(
+                x=x_range,
+                y=intercepts[i] + slopes[i] * x_range,
+                mode='lines',
+                name=f'Trend ({titles.get(var, var)})',
+                line=dict(color='rgba(255, 0, 0, 0.8)'),
+                showlegend=False
+            )
+            fig.add_trace(trend, row=row, col=col)
 
         # Update axes titles
         fig.update_xaxes(title_text=labels.get(var, var), row=row, col=col)
@@ -233,30 +236,51 @@ def display_scatter_analysis(filtered_data, variables, labels):
         hovermode="closest"
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig.to_dict()
 
 
-def display_time_series_analysis(filtered_data, variables, labels):
-    """Display time series analysis with preprocessed data"""
-    st.subheader("Yield and Selected Factors Over Time")
+def display_scatter_analysis(filtered_data, variables, labels):
+    """Display scatter plot analysis with preprocessed data"""
+    st.subheader("Relationship between Climate Factors and Yield")
     
     if not variables:
-        st.error("No time-series variables found in the data.")
+        st.error("No analysis variables found in the data.")
         return
-
-    # Variable selection for time series
-    default_time_vars = variables
-    time_vars = st.multiselect(
-        "Select factors to compare with yield over time",
+    
+    titles = labels  # Use labels as titles
+    
+    # Variable selection
+    default_vars = variables[:min(3, len(variables))]
+    selected_vars = st.multiselect(
+        "Select variables to display",
         options=variables,
-        default=default_time_vars,
-        format_func=lambda x: x.upper()
+        default=default_vars,
+        format_func=lambda x: titles.get(x, x)
     )
 
-    if not time_vars:
+    if not selected_vars:
         st.info("Please select at least one variable to display")
         return
 
+    # Build the subplots, cached per year range and variable selection
+    fig = _build_scatter(filtered_data, tuple(selected_vars), labels)
+
+    st.plotly_chart(go.Figure(fig), use_container_width=True)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_time_series(filtered_data, time_vars):
+    """
+    Build the yield over time figure with the selected factors normalized on a second axis
+
+    Args:
+        filtered_data: Yearly averages for the selected year range
+        time_vars: Tuple of selected variables
+
+    Returns the figure as a dict and a list of (variable, error) for traces that could not be added
+    """
+    import plotly.express as px
+
     # Create the base time series figure with yield
     fig = px.line(
         filtered_data,
@@ -266,24 +290,26 @@ def display_time_series_analysis(filtered_data, variables, labels):
         labels={'year': 'Year', 'yield': 'Yield (tons/ha)'}
     )
 
-    # Create a copy of filtered data for normalization
-    # This avoids modifying the original data which might be used elsewhere
-    norm_data = filtered_data.copy()
-    
+    # Normalize all selected variables to fit on same scale as yield in one
+    # pass over a local array, so filtered_data is neither copied nor modified
+    values = filtered_data[list(time_vars)].to_numpy(dtype=np.float64)
+    vmin = np.nanmin(values, axis=0)
+    vrange = np.nanmax(values, axis=0) - vmin
+    norm = np.where(
+        vrange == 0,
+        0.5,
+        (values - vmin) / np.where(vrange == 0, 1, vrange) * 0.8 + 0.1
+    )
+    years = filtered_data['year'].to_numpy()
+
     # Add normalized traces for each selected variable
-    for var in time_vars:
+    failed = []
+    for j, var in enumerate(time_vars):
         try:
-            # Normalize values to fit on same scale as yield
-            if norm_data[var].max() != norm_data[var].min():
-                norm_data[f'{var}_norm'] = (norm_data[var] - norm_data[var].min()) / (
-                        norm_data[var].max() - norm_data[var].min()) * 0.8 + 0.1
-            else:
-                norm_data[f'{var}_norm'] = 0.5
-
             # Add variable as second y-axis
             fig.add_scatter(
-                x=norm_data['year'],
-                y=norm_data[f'{var}_norm'],
+                x=years,
+                y=norm[:, j],
                 name=var.upper(),
                 line=dict(dash='dash'),
                 yaxis='y2',
@@ -291,10 +317,10 @@ def display_time_series_analysis(filtered_data, variables, labels):
                 f'Year: %{{x}}<br>' +
                 f'{var.upper()}: %{{customdata}}<br>' +
                 '<extra></extra>',
-                customdata=norm_data[var]
+                customdata=values[:, j]
             )
         except Exception as e:
-            st.warning(f"Could not plot {var}: {str(e)}")
+            failed.append((var, str(e)))
 
     # Update layout with second y-axis
     fig.update_layout(
@@ -308,32 +334,92 @@ def display_time_series_analysis(filtered_data, variables, labels):
         height=500
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig.to_dict(), failed
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_correlation(filtered_data, time_vars):
+    """
+    Build the correlation heatmap of yield and the selected variables
+
+    Args:
+        filtered_data: Yearly averages for the selected year range
+        time_vars: Tuple of selected variables
+
+    Returns the figure as a dict
+    """
+    import plotly.express as px
+
+    # Only calculate correlation for selected variables
+    correlation_vars = ['yield'] + list(time_vars)
+    values = filtered_data[correlation_vars].to_numpy(dtype=np.float32)
+    if len(values) < 2:
+        # A single year has no correlation, all NaN like DataFrame.corr() without the warnings
+        corr_matrix = pd.DataFrame(np.nan, index=correlation_vars, columns=correlation_vars)
+    elif np.isnan(values).any():
+        # Pairwise-complete correlations for gaps, as np.corrcoef would propagate NaN
+        corr_matrix = filtered_data[correlation_vars].corr()
+    else:
+        corr_matrix = pd.DataFrame(
+            np.corrcoef(values, rowvar=False),
+            index=correlation_vars,
+            columns=correlation_vars
+        )
+    
+    # Create heatmap
+    fig_heatmap = px.imshow(
+        corr_matrix,
+        text_auto=True,
+        aspect="auto",
+        color_continuous_scale="RdBu_r",
+        title="Correlation Matrix"
+    )
+    return fig_heatmap.to_dict()
+
+
+def display_time_series_analysis(filtered_data, variables, labels):
+    """Display time series analysis with preprocessed data"""
+    st.subheader("Yield and Selected Factors Over Time")
+    
+    if not variables:
+        st.error("No time-series variables found in the data.")
+        return
+
+    # Variable selection for time series
+    default_time_vars = variables
+    time_vars = st.multiselect(
+        "Select factors to compare with yield over time",
+        options=variables,
+        default=default_time_vars,
+        format_func=lambda x: x.upper()
+    )
+
+    if not time_vars:
+        st.info("Please select at least one variable to display")
+        return
+
+    # Build the chart, cached per year range and variable selection
+    fig, failed = _build_time_series(filtered_data, tuple(time_vars))
+    for var, error in failed:
+        st.warning(f"Could not plot {var}: {error}")
+
+    st.plotly_chart(go.Figure(fig), use_container_width=True)
 
     # Correlation analysis
     st.subheader("Correlation Analysis")
     try:
-        # Only calculate correlation for selected variables
-        correlation_vars = ['yield'] + time_vars
-        corr_matrix = filtered_data[correlation_vars].corr()
-        
-        # Create heatmap
-        fig_heatmap = px.imshow(
-            corr_matrix,
-            text_auto=True,
-            aspect="auto",
-            color_continuous_scale="RdBu_r",
-            title="Correlation Matrix"
-        )
-        st.plotly_chart(fig_heatmap, use_container_width=True)
+        fig_heatmap = _build_correlation(filtered_data, tuple(time_vars))
+        st.plotly_chart(go.Figure(fig_heatmap), use_container_width=True)
     except Exception as e:
         st.error(f"Could not create correlation heatmap: {str(e)}")
 
 # Add a reset button function to clear cached data if needed
 def reset_regression_cache():
     if st.sidebar.button("Reset Regression Analysis Cache"):
-        if 'regression_preprocessed_data' in st.session_state:
-            del st.session_state['regression_preprocessed_data']
+        prepare_data_for_analysis.clear()
+        _build_scatter.clear()
+        _build_time_series.clear()
+        _build_correlation.clear()
         if 'regression_view' in st.session_state:
             del st.session_state['regression_view']
         st.experimental_rerun()
\ No newline at end of file
@@ -1,61 +1,200 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Columns used by the country-wise pages
+COUNTRY_COLUMNS = ['Day', 'Country', 'yield', 'year']
+
+# Day of year whose yield is displayed by the analysis pages
+HARVEST_DAY = 239
+
+# Columns every data and prediction file must have to be loaded
+REQUIRED_COLUMNS = frozenset(COUNTRY_COLUMNS)
+
+# Maximum number of parquet files read at the same time
+MAX_READ_WORKERS = 8
+
+# Directories holding the recorded data and the model predictions
+DATA_DIR = "data/parquet"
+PREDICTIONS_DIR = "data/Parquet_Predictions"
+
+# Last fingerprint seen for each directory in this process
+_last_fingerprints = {}
+
+# Function to list the Parquet file entries of a directory in one scandir pass
+def _parquet_entries(directory):
+    with os.scandir(directory) as entries:
+        return [entry for entry in entries if entry.is_file() and entry.name.endswith('.parquet')]
 
 # Function to get all Parquet files from "data/parquet/" directory
 def get_parquet_files():
-    return [f for f in os.listdir("data/parquet") if f.endswith('.parquet')]
+    return [entry.name for entry in _parquet_entries(DATA_DIR)]
 
 # Function to extract country name from filename
 def extract_country_name(filename):
     return filename.replace('maize_', '').replace('.parquet', '')
 
-# Load and preprocess data for all countries from Parquet
-@st.cache_data
-def load_all_data():
+# Function to shrink the dtypes of a loaded dataframe
+def _compact(df):
+    # Categorical country names group on integer codes instead of strings
+    df['Country'] = df['Country'].astype('category')
+    # Years and days fit in int16 and yields are shown with 2 decimals,
+    # so the narrower types halve the bytes the groupby/mean passes read
+    df['year'] = df['year'].astype(np.int16, copy=False)
+    df['yield'] = df['yield'].astype(np.float32, copy=False)
+    if 'Day' in df.columns:
+        df['Day'] = df['Day'].astype(np.int16, copy=False)
+    return df
+
+# Function to read a set of parquet files in a single Arrow scan
+def _scan_parquet(paths, columns=None, day=None):
     """
-    Loads all country data from parquet files and processes them
-    Returns a dataframe with all countries' yield data
+    Reads the files as one PyArrow dataset and returns a single dataframe
+
+    Args:
+        paths: Parquet file paths, files without REQUIRED_COLUMNS are skipped
+        columns: Optional list of columns to read, all columns are read if None
+        day: Optional day to keep, filtered during the scan and the Day column is dropped
+    """
+    # Read the file footers in parallel, PyArrow releases the GIL while reading
+    all_fragments = list(ds.dataset(paths, format="parquet").get_fragments())
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_READ_WORKERS, len(all_fragments)))) as pool:
+        schemas = list(pool.map(lambda fragment: fragment.physical_schema, all_fragments))
+
+    # Ensure required columns exist
+    fragments = []
+    file_schemas = []
+    for fragment, file_schema in zip(all_fragments, schemas):
+        if REQUIRED_COLUMNS.issubset(file_schema.names):
+            fragments.append(fragment)
+            file_schemas.append(file_schema)
+
+    # Union of the file schemas, so columns only some countries have (e.g. State) are kept
+    schema = pa.unify_schemas(file_schemas, promote_options="permissive")
+    dataset = ds.dataset([fragment.path for fragment in fragments], schema=schema, format="parquet")
+
+    if columns is None:
+        columns = schema.names
+    day_filter = None
+    if day is not None:
+        columns = [column for column in columns if column != 'Day']
+        day_filter = ds.field('Day') == day
+
+    # Scan up to MAX_READ_WORKERS files concurrently on Arrow's thread pool
+    table = dataset.to_table(
+        columns=columns,
+        filter=day_filter,
+        fragment_readahead=MAX_READ_WORKERS,
+        use_threads=True
+    )
+
+    # The table is not used again, so its buffers are released column by
+    # column during the conversion instead of being held alongside the frame
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    # Narrow before the offset so the shift runs on int16 instead of a new int64 column
+    df['year'] = df['year'].astype(np.int16) + np.int16(1601)
+    return _compact(df)
+
+# Function to identify the current contents of a parquet directory
+def _dir_fingerprint(directory):
+    """
+    Returns (file, size, modification time) for each parquet file, sorted by name.
+    Only lists and stats the files, so it is cheap enough to compute on every rerun.
     """
-    parquet_files = get_parquet_files()
-    all_data = []
+    fingerprint = []
+    for entry in _parquet_entries(directory):
+        stat = entry.stat()
+        fingerprint.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(sorted(fingerprint))
 
-    for file in parquet_files:
-        df = pd.read_parquet(f"data/parquet/{file}")
-        country = extract_country_name(file)
+# Function to identify the current data (or prediction) files
+def get_data_fingerprint(predicted=False):
+    """
+    Returns the _dir_fingerprint of the data or prediction directory.
+    Caches built from the loaded data take it as an argument, so they are
+    rebuilt when the files change.
+    """
+    directory = PREDICTIONS_DIR if predicted else DATA_DIR
+    fingerprint = _dir_fingerprint(directory)
+    # Streamlit does not delete evicted entries from disk, so the persisted
+    # copies of the old files are dropped here once the files change. clear()
+    # drops the other directory's entries too, which then reload once on their
+    # next use; directory changes are rare enough that this is cheaper than
+    # tracking every (directory, columns, day) key to clear them one by one
+    previous = _last_fingerprints.setdefault(directory, fingerprint)
+    if previous != fingerprint:
+        _load_parquet_dir.clear()
+        _last_fingerprints[directory] = fingerprint
+    return fingerprint
 
-        # Ensure required columns exist
-        required_columns = {'Day', 'Country', 'yield', 'year'}
-        if required_columns.issubset(df.columns):
-            df['year'] = df['year']+1601
-            all_data.append(df)
+# Load a parquet directory, cached on disk so restarts skip the read. At most two
+# entries per directory and column selection, the current files and the previous ones
+@st.cache_data(persist="disk", max_entries=8, show_spinner="Loading data... Please wait")
+def _load_parquet_dir(directory, fingerprint, columns, day):
+    """
+    Reads the files listed in the fingerprint with _scan_parquet
+
+    Args:
+        directory: Directory holding the parquet files
+        fingerprint: Result of _dir_fingerprint, part of the cache key so
+            the cache is only invalidated when the files change
+        columns: Optional list of columns to read, all columns are read if None
+        day: Optional day to keep, the Day column is dropped when given
+    """
+    return _scan_parquet([f"{directory}/{file}" for file, _, _ in fingerprint], columns, day)
+
+# Load and preprocess data for all countries from Parquet
+def load_all_data(columns=None, day=None, fingerprint=None):
+    """
+    Loads all country data from parquet files and processes them
+    Returns a dataframe with all countries' yield data
 
-    return pd.concat(all_data)
+    Args:
+        columns: Optional list of columns to read, all columns are read if None
+        day: Optional day to keep, the Day column is dropped when given
+        fingerprint: Optional result of get_data_fingerprint(), computed if None
+    """
+    if fingerprint is None:
+        fingerprint = get_data_fingerprint()
+    return _load_parquet_dir(DATA_DIR, fingerprint, columns, day)
 
 # Function to get all CSV files from "predictions/" directory
 def get_prediction_parquet_files():
-    return [f for f in os.listdir("data/Parquet_Predictions") if f.endswith('.parquet')]
+    return [entry.name for entry in _parquet_entries(PREDICTIONS_DIR)]
 
 # Function to load and preprocess all prediction data from CSV files
-@st.cache_data
-def load_all_predictions():
+def load_all_predictions(columns=None, day=None, fingerprint=None):
     """
     Loads all prediction data from CSV files in the 'predictions' folder.
     Returns a dataframe with all prediction data.
+
+    Args:
+        columns: Optional list of columns to read, all columns are read if None
+        day: Optional day to keep, the Day column is dropped when given
+        fingerprint: Optional result of get_data_fingerprint(predicted=True), computed if None
+    """
+    if fingerprint is None:
+        fingerprint = get_data_fingerprint(predicted=True)
+    return _load_parquet_dir(PREDICTIONS_DIR, fingerprint, columns, day)
+
+# Rows of a single country, keyed on the fingerprint so new files are picked up
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _country_slice(country, predicted, fingerprint):
+    if predicted:
+        df = load_all_predictions(fingerprint=fingerprint)
+    else:
+        df = load_all_data(fingerprint=fingerprint)
+    return df[df['Country'] == country]
+
+# Function to get the rows of a single country without re-filtering on every rerun
+def get_country_slice(country, predicted=False):
+    """
+    Loads all data (or predictions) and returns the rows for one country.
+    The result is shared across reruns and sessions, so callers must not modify it.
     """
-    csv_files = get_prediction_parquet_files()
-    all_predictions = []
-
-    for file in csv_files:
-        df = pd.read_parquet(f"data/Parquet_Predictions/{file}")
-        
-        # Optional: Extract metadata like country name if useful
-        # country = extract_country_name(file)  # reuse if applicable
-        # df['Country'] = country
-        
-        # Ensure expected columns are present before appending
-        if {'Day', 'Country', 'yield', 'year'}.issubset(df.columns):
-            df['year'] = df['year'] + 1601
-            all_predictions.append(df)
-
-    return pd.concat(all_predictions)
+    return _country_slice(country, predicted, get_data_fingerprint(predicted))